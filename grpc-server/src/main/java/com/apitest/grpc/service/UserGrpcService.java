@@ -5,6 +5,7 @@ import com.apitest.grpc.model.OrderEntity;
 import com.apitest.grpc.model.OrderItemEntity;
 import com.apitest.grpc.model.UserEntity;
 import com.google.protobuf.Timestamp;
+import io.grpc.stub.ServerCallStreamObserver;
 import io.grpc.stub.StreamObserver;
 import lombok.RequiredArgsConstructor;
 import lombok.extern.slf4j.Slf4j;
@@ -70,6 +71,7 @@ public class UserGrpcService extends UserServiceGrpc.UserServiceImplBase {
                     .setCurrentPage(page)
                     .build();
 
+            enableCompression(responseObserver);
             responseObserver.onNext(response);
             responseObserver.onCompleted();
 
@@ -122,6 +124,7 @@ public class UserGrpcService extends UserServiceGrpc.UserServiceImplBase {
                     .addAllOrders(orders)
                     .build();
 
+            enableCompression(responseObserver);
             responseObserver.onNext(response);
             responseObserver.onCompleted();
 
@@ -148,6 +151,7 @@ public class UserGrpcService extends UserServiceGrpc.UserServiceImplBase {
                     .addAllUsers(users)
                     .build();
 
+            enableCompression(responseObserver);
             responseObserver.onNext(response);
             responseObserver.onCompleted();
 
@@ -182,6 +186,7 @@ public class UserGrpcService extends UserServiceGrpc.UserServiceImplBase {
                     .addAllUsers(users)
                     .build();
 
+            enableCompression(responseObserver);
             responseObserver.onNext(response);
             responseObserver.onCompleted();
 
@@ -193,6 +198,103 @@ public class UserGrpcService extends UserServiceGrpc.UserServiceImplBase {
         }
     }
 
+    @Override
+    public void streamListUsers(ListUsersRequest request, StreamObserver<ListUsersStreamResponse> responseObserver) {
+        long startTime = System.nanoTime();
+        try {
+            int page = request.getPage();
+            int size = request.getSize() > 0 ? request.getSize() : 20;
+
+            List<UserEntity> userEntities = dataService.listUsers(page, size);
+            long totalElements = dataService.getTotalUsers();
+            int totalPages = (int) Math.ceil((double) totalElements / size);
+
+            PageInfo pageInfo = PageInfo.newBuilder()
+                    .setTotalElements(totalElements)
+                    .setTotalPages(totalPages)
+                    .setCurrentPage(page)
+                    .build();
+
+            enableCompression(responseObserver);
+            responseObserver.onNext(ListUsersStreamResponse.newBuilder()
+                    .setPageInfo(pageInfo)
+                    .build());
+            for (UserEntity userEntity : userEntities) {
+                responseObserver.onNext(ListUsersStreamResponse.newBuilder()
+                        .setUser(convertToProtoUser(userEntity))
+                        .build());
+            }
+            responseObserver.onCompleted();
+
+            long duration = System.nanoTime() - startTime;
+            log.debug("streamListUsers completed in {} ms", duration / 1_000_000.0);
+        } catch (Exception e) {
+            log.error("Error in streamListUsers", e);
+            responseObserver.onError(e);
+        }
+    }
+
+    @Override
+    public void streamSearchUsers(SearchUsersRequest request, StreamObserver<User> responseObserver) {
+        long startTime = System.nanoTime();
+        try {
+            int limit = request.getLimit() > 0 ? request.getLimit() : 10;
+            List<UserEntity> userEntities = dataService.searchUsers(request.getQuery(), limit);
+
+            enableCompression(responseObserver);
+            for (UserEntity userEntity : userEntities) {
+                responseObserver.onNext(convertToProtoUser(userEntity));
+            }
+            responseObserver.onCompleted();
+
+            long duration = System.nanoTime() - startTime;
+            log.debug("streamSearchUsers completed in {} ms", duration / 1_000_000.0);
+        } catch (Exception e) {
+            log.error("Error in streamSearchUsers", e);
+            responseObserver.onError(e);
+        }
+    }
+
+    @Override
+    public StreamObserver<GetUserRequest> streamGetUsers(StreamObserver<GetUserResponse> responseObserver) {
+        return new StreamObserver<>() {
+            @Override
+            public void onNext(GetUserRequest request) {
+                try {
+                    UserEntity userEntity = dataService.getUserById(request.getUserId());
+                    GetUserResponse.Builder response = GetUserResponse.newBuilder();
+                    if (userEntity != null) {
+                        response.setUser(convertToProtoUser(userEntity));
+                    }
+                    responseObserver.onNext(response.build());
+                } catch (Exception e) {
+                    log.error("Error in streamGetUsers", e);
+                    responseObserver.onError(e);
+                }
+            }
+
+            @Override
+            public void onError(Throwable t) {
+                log.debug("streamGetUsers cancelled by client: {}", t.getMessage());
+            }
+
+            @Override
+            public void onCompleted() {
+                responseObserver.onCompleted();
+            }
+        };
+    }
+
+    /**
+     * Gzip the response of RPCs returning repeated, string-heavy messages.
+     * gRPC falls back to identity when the client does not accept gzip.
+     */
+    private void enableCompression(StreamObserver<?> responseObserver) {
+        if (responseObserver instanceof ServerCallStreamObserver) {
+            ((ServerCallStreamObserver<?>) responseObserver).setCompression("gzip");
+        }
+    }
+
     private User convertToProtoUser(UserEntity entity) {
         Timestamp createdAt = Timestamp.newBuilder()
                 .setSeconds(entity.getCreatedAt().getEpochSecond())
@@ -2,12 +2,12 @@
 """
 Python gRPC Client for UserService
 
-This client tests all 6 RPC methods exposed by the gRPC server:
+This client tests the RPC methods exposed by the gRPC server:
 1. GetUser
-2. ListUsers
+2. ListUsers (via the server-streaming StreamListUsers)
 3. CreateUser
 4. GetUserOrders
-5. SearchUsers
+5. SearchUsers (via the server-streaming StreamSearchUsers)
 6. BulkCreateUsers
 
 Before running:
@@ -16,9 +16,20 @@ Before running:
 3. Ensure the gRPC server is running on localhost:9090
 """
 
-import grpc
+import asyncio
+import itertools
+import logging
+import os
 import sys
 from datetime import datetime
+from functools import lru_cache
+
+# Use the native upb protobuf runtime instead of the pure-Python one.
+# Must be set before any protobuf module is imported.
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
+
+import grpc
+from google.protobuf.internal import api_implementation
 
 # Import generated gRPC code
 try:
@@ -29,201 +40,403 @@ except ImportError:
     print("Please run: ./generate_grpc.sh")
     sys.exit(1)
 
+logger = logging.getLogger(__name__)
+
+# Maximum number of users per BulkCreateUsers request; larger bulks are split
+# into chunks that are sent concurrently
+BULK_CHUNK_SIZE = 256
+
+if api_implementation.Type() not in ("upb", "cpp"):
+    logger.warning("Using the slow '%s' protobuf runtime (install protobuf>=4.21 for the upb runtime)",
+                   api_implementation.Type())
+
+
+# Cached builders for the parameter-only request messages: repeated calls with
+# the same arguments reuse one message. gRPC only reads them, so sharing is safe
+# as long as callers never mutate a returned request.
+@lru_cache(maxsize=128)
+def _get_user_request(user_id):
+    return user_service_pb2.GetUserRequest(user_id=user_id)
+
+
+@lru_cache(maxsize=128)
+def _list_users_request(page, size):
+    return user_service_pb2.ListUsersRequest(page=page, size=size)
+
+
+@lru_cache(maxsize=128)
+def _get_user_orders_request(user_id):
+    return user_service_pb2.GetUserOrdersRequest(user_id=user_id)
+
+
+@lru_cache(maxsize=128)
+def _search_users_request(query, limit):
+    return user_service_pb2.SearchUsersRequest(query=query, limit=limit)
+
+
+@lru_cache(maxsize=128)
+def _create_user_payload(username, email, first_name, last_name):
+    """Serialized CreateUserRequest, encoded once per distinct set of fields"""
+    # Plain field stores skip the generic keyword-argument constructor
+    request = user_service_pb2.CreateUserRequest()
+    request.username = username
+    request.email = email
+    request.first_name = first_name
+    request.last_name = last_name
+    return request.SerializeToString()
+
 
 class UserServiceClient:
-    """Client for testing UserService gRPC endpoints"""
+    """Asyncio client for testing UserService gRPC endpoints
 
-    def __init__(self, host='localhost', port=9090):
-        """Initialize the gRPC client"""
-        self.channel = grpc.insecure_channel(f'{host}:{port}')
-        self.stub = user_service_pb2_grpc.UserServiceStub(self.channel)
-        print(f"Connected to gRPC server at {host}:{port}")
+    Every RPC method is a coroutine, so independent calls can be awaited
+    together with asyncio.gather(). Each method logs its report only after
+    its RPC has finished, so concurrent calls do not interleave output.
+    """
 
-    def close(self):
-        """Close the gRPC channel"""
-        self.channel.close()
-        print("Connection closed")
+    def __init__(self, host='localhost', port=9090, pool_size=4):
+        """Initialize the gRPC client; await connect() before the first RPC
 
-    def get_user(self, user_id):
-        """Test GetUser RPC method"""
-        print(f"\n=== Testing GetUser (user_id={user_id}) ===")
+        Args:
+            pool_size: Number of independent channels (HTTP/2 connections)
+                that calls are spread across round-robin
+        """
+        self.host = host
+        self.port = port
+        options = [
+            # A local subchannel pool keeps each channel on its own connection
+            # instead of gRPC sharing one subchannel between them
+            ('grpc.use_local_subchannel_pool', 1),
+            # Keep idle connections alive between tests
+            ('grpc.keepalive_time_ms', 30000),
+            ('grpc.keepalive_timeout_ms', 10000),
+            ('grpc.http2.max_pings_without_data', 0),
+            ('grpc.http2.min_time_between_pings_ms', 10000),
+            # Large frames and a large initial stream window let bulk payloads
+            # go out in few writes without waiting on WINDOW_UPDATEs
+            # (max_frame_size is capped at 2^24-1 by HTTP/2)
+            ('grpc.http2.max_frame_size', 16 * 1024 * 1024 - 1),
+            ('grpc.http2.lookahead_bytes', 4 * 1024 * 1024),
+            ('grpc.optimization_target', 'throughput'),
+        ]
+        self._channels = [
+            grpc.aio.insecure_channel(f'{host}:{port}', options=options)
+            for _ in range(pool_size)
+        ]
+        self._stubs = [user_service_pb2_grpc.UserServiceStub(c) for c in self._channels]
+        # CreateUser sends cached pre-serialized bytes, so it skips the stub's serializer
+        self._create_user_calls = [
+            c.unary_unary(
+                '/api.performance.UserService/CreateUser',
+                request_serializer=None,
+                response_deserializer=user_service_pb2.CreateUserResponse.FromString
+            )
+            for c in self._channels
+        ]
+        self._rr = itertools.count()
+
+    async def connect(self, timeout=5):
+        """Wait for every channel to become READY
+
+        Connecting up front keeps the handshake out of the first RPC.
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(c.channel_ready() for c in self._channels)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("gRPC server at %s:%s not ready after %ss", self.host, self.port, timeout)
+        else:
+            logger.info("Connected to gRPC server at %s:%s (%d channels)",
+                        self.host, self.port, len(self._channels))
+
+    def _stub(self):
+        """Pick the next stub from the channel pool"""
+        return self._stubs[next(self._rr) % len(self._stubs)]
+
+    async def close(self):
+        """Close all gRPC channels"""
+        await asyncio.gather(*(c.close() for c in self._channels))
+        logger.info("Connection closed")
+
+    async def _call(self, rpc, request, header, **kwargs):
+        """Await a unary RPC, logging the test header and error on failure
+
+        Args:
+            header: (format, *args) tuple for the test header line
+
+        Returns:
+            The response message, or None if the RPC failed
+        """
         try:
-            request = user_service_pb2.GetUserRequest(user_id=user_id)
-            response = self.stub.GetUser(request)
-            print(f"Success! User: {response.user.username} ({response.user.email})")
-            print(f"  ID: {response.user.id}")
-            print(f"  Name: {response.user.first_name} {response.user.last_name}")
-            print(f"  Active: {response.user.is_active}")
-            return response.user
+            return await rpc(request, **kwargs)
         except grpc.RpcError as e:
-            print(f"Error: {e.code()} - {e.details()}")
+            logger.info(*header)
+            logger.error("Error: %s - %s", e.code(), e.details())
             return None
 
-    def list_users(self, page=0, size=10):
-        """Test ListUsers RPC method"""
-        print(f"\n=== Testing ListUsers (page={page}, size={size}) ===")
+    async def _consume(self, call, header, handle):
+        """Feed each message of a server-streaming RPC to handle() as it arrives
+
+        Messages are processed while later ones are still on the wire; only
+        the report logging is left to the caller, once the stream is done.
+
+        Returns:
+            True if the stream completed, False if the RPC failed (after
+            logging the test header and error)
+        """
         try:
-            request = user_service_pb2.ListUsersRequest(page=page, size=size)
-            response = self.stub.ListUsers(request)
-            print(f"Success! Found {len(response.users)} users")
-            print(f"  Total elements: {response.total_elements}")
-            print(f"  Total pages: {response.total_pages}")
-            print(f"  Current page: {response.current_page}")
-            for user in response.users:
-                print(f"  - {user.id}: {user.username} ({user.email})")
-            return response.users
+            async for message in call:
+                handle(message)
+            return True
         except grpc.RpcError as e:
-            print(f"Error: {e.code()} - {e.details()}")
+            logger.info(*header)
+            logger.error("Error: %s - %s", e.code(), e.details())
+            return False
+
+    async def get_user(self, user_id):
+        """Test GetUser RPC method"""
+        header = ("\n=== Testing GetUser (user_id=%s) ===", user_id)
+        response = await self._call(self._stub().GetUser, _get_user_request(user_id), header)
+        if response is None:
+            return None
+        user = response.user
+        logger.info(*header)
+        logger.info("Success! User: %s (%s)", user.username, user.email)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("  ID: %s", user.id)
+            logger.debug("  Name: %s %s", user.first_name, user.last_name)
+            logger.debug("  Active: %s", user.is_active)
+        return user
+
+    async def list_users(self, page=0, size=10):
+        """Test ListUsers via the server-streaming StreamListUsers RPC
+
+        Users are parsed one message at a time as they arrive instead of
+        as a single ListUsersResponse holding the whole page.
+        """
+        header = ("\n=== Testing ListUsers (page=%s, size=%s) ===", page, size)
+        page_info = None
+        users = []
+
+        def handle(message):
+            nonlocal page_info
+            if message.HasField('page_info'):
+                page_info = message.page_info
+            else:
+                users.append(message.user)
+
+        if not await self._consume(self._stub().StreamListUsers(_list_users_request(page, size)), header, handle):
             return None
+        logger.info(*header)
+        logger.info("Success! Found %d users", len(users))
+        if page_info is not None:
+            logger.info("  Total elements: %s", page_info.total_elements)
+            logger.info("  Total pages: %s", page_info.total_pages)
+            logger.info("  Current page: %s", page_info.current_page)
+        if logger.isEnabledFor(logging.DEBUG):
+            for user in users:
+                logger.debug("  - %s: %s (%s)", user.id, user.username, user.email)
+        return users
 
-    def create_user(self, username, email, first_name, last_name):
+    async def create_user(self, username, email, first_name, last_name):
         """Test CreateUser RPC method"""
-        print(f"\n=== Testing CreateUser (username={username}) ===")
-        try:
-            request = user_service_pb2.CreateUserRequest(
-                username=username,
-                email=email,
-                first_name=first_name,
-                last_name=last_name
-            )
-            response = self.stub.CreateUser(request)
-            print(f"Success! Created user: {response.user.username}")
-            print(f"  ID: {response.user.id}")
-            print(f"  Email: {response.user.email}")
-            print(f"  Name: {response.user.first_name} {response.user.last_name}")
-            return response.user
-        except grpc.RpcError as e:
-            print(f"Error: {e.code()} - {e.details()}")
+        payload = _create_user_payload(username, email, first_name, last_name)
+        create_user_call = self._create_user_calls[next(self._rr) % len(self._create_user_calls)]
+        header = ("\n=== Testing CreateUser (username=%s) ===", username)
+        response = await self._call(create_user_call, payload, header)
+        if response is None:
             return None
+        user = response.user
+        logger.info(*header)
+        logger.info("Success! Created user: %s", user.username)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("  ID: %s", user.id)
+            logger.debug("  Email: %s", user.email)
+            logger.debug("  Name: %s %s", user.first_name, user.last_name)
+        return user
 
-    def get_user_orders(self, user_id):
-        """Test GetUserOrders RPC method"""
-        print(f"\n=== Testing GetUserOrders (user_id={user_id}) ===")
-        try:
-            request = user_service_pb2.GetUserOrdersRequest(user_id=user_id)
-            response = self.stub.GetUserOrders(request)
-            print(f"Success! Found {len(response.orders)} orders")
-            for order in response.orders:
-                print(f"  - Order {order.id}: ${order.total_amount} ({order.status})")
-                print(f"    Items: {len(order.items)}")
-                for item in order.items:
-                    print(f"      - {item.product_name}: {item.quantity} x ${item.unit_price}")
-            return response.orders
-        except grpc.RpcError as e:
-            print(f"Error: {e.code()} - {e.details()}")
+    async def get_user_orders(self, user_id):
+        """Test GetUserOrders RPC method
+
+        With the upb runtime the nested orders/items are parsed into a native
+        arena and only turned into Python objects when a field is read, so
+        the item walk below (DEBUG only) is the sole per-field cost.
+        """
+        header = ("\n=== Testing GetUserOrders (user_id=%s) ===", user_id)
+        response = await self._call(self._stub().GetUserOrders, _get_user_orders_request(user_id), header)
+        if response is None:
             return None
+        orders = response.orders
+        logger.info(*header)
+        logger.info("Success! Found %d orders", len(orders))
+        if logger.isEnabledFor(logging.DEBUG):
+            for order in orders:
+                items = order.items
+                logger.debug("  - Order %s: $%s (%s)", order.id, order.total_amount, order.status)
+                logger.debug("    Items: %d", len(items))
+                for item in items:
+                    logger.debug("      - %s: %s x $%s", item.product_name, item.quantity, item.unit_price)
+        return orders
 
-    def search_users(self, query, limit=10):
-        """Test SearchUsers RPC method"""
-        print(f"\n=== Testing SearchUsers (query='{query}', limit={limit}) ===")
-        try:
-            request = user_service_pb2.SearchUsersRequest(query=query, limit=limit)
-            response = self.stub.SearchUsers(request)
-            print(f"Success! Found {len(response.users)} users")
-            for user in response.users:
-                print(f"  - {user.id}: {user.username} ({user.email})")
-            return response.users
-        except grpc.RpcError as e:
-            print(f"Error: {e.code()} - {e.details()}")
+    async def search_users(self, query, limit=10):
+        """Test SearchUsers via the server-streaming StreamSearchUsers RPC"""
+        header = ("\n=== Testing SearchUsers (query='%s', limit=%s) ===", query, limit)
+        users = []
+        if not await self._consume(self._stub().StreamSearchUsers(_search_users_request(query, limit)), header,
+                                   users.append):
             return None
+        logger.info(*header)
+        logger.info("Success! Found %d users", len(users))
+        if logger.isEnabledFor(logging.DEBUG):
+            for user in users:
+                logger.debug("  - %s: %s (%s)", user.id, user.username, user.email)
+        return users
 
-    def bulk_create_users(self, users_data):
+    async def bulk_create_users(self, users_data):
         """Test BulkCreateUsers RPC method
 
         Args:
             users_data: List of dicts with keys: username, email, first_name, last_name
         """
-        print(f"\n=== Testing BulkCreateUsers (count={len(users_data)}) ===")
-        try:
-            users_requests = [
-                user_service_pb2.CreateUserRequest(
-                    username=user['username'],
-                    email=user['email'],
-                    first_name=user['first_name'],
-                    last_name=user['last_name']
-                )
-                for user in users_data
-            ]
-            request = user_service_pb2.BulkCreateUsersRequest(users=users_requests)
-            response = self.stub.BulkCreateUsers(request)
-            print(f"Success! Created {len(response.users)} users")
-            for user in response.users:
-                print(f"  - {user.id}: {user.username} ({user.email})")
-            return response.users
-        except grpc.RpcError as e:
-            print(f"Error: {e.code()} - {e.details()}")
-            return None
+        requests = []
+        for start in range(0, len(users_data), BULK_CHUNK_SIZE):
+            # Build sub-messages in place to avoid copying them into the repeated
+            # field, and set fields directly rather than through keyword arguments
+            request = user_service_pb2.BulkCreateUsersRequest()
+            add_user = request.users.add
+            for user in users_data[start:start + BULK_CHUNK_SIZE]:
+                message = add_user()
+                message.username = user['username']
+                message.email = user['email']
+                message.first_name = user['first_name']
+                message.last_name = user['last_name']
+            requests.append(request)
+        return await self._bulk_create_users(requests, len(users_data))
 
+    async def bulk_create_users_raw(self, user_requests):
+        """Test BulkCreateUsers RPC method with prebuilt messages
 
-def run_all_tests():
+        Args:
+            user_requests: List of user_service_pb2.CreateUserRequest
+        """
+        requests = []
+        for start in range(0, len(user_requests), BULK_CHUNK_SIZE):
+            request = user_service_pb2.BulkCreateUsersRequest()
+            request.users.extend(user_requests[start:start + BULK_CHUNK_SIZE])
+            requests.append(request)
+        return await self._bulk_create_users(requests, len(user_requests))
+
+    async def _bulk_create_users(self, requests, count):
+        """Send BulkCreateUsersRequest chunks concurrently and report the created users
+
+        Each chunk goes out on the next channel of the pool, so large bulks
+        are spread over several connections and stay within their flow-control
+        windows.
+
+        Chunks are separate RPCs, so unlike a single BulkCreateUsers call
+        this is not all-or-nothing: if some chunks fail, the users from the
+        others have still been created on the server.
+
+        Returns:
+            The created users in input order. When chunks failed, only the
+            users of the chunks that succeeded (compare len() with the
+            number requested); an empty list if every chunk failed.
+        """
+        header = ("\n=== Testing BulkCreateUsers (count=%d) ===", count)
+        # The bulk payload is the only large request; compress it on the wire
+        responses = await asyncio.gather(*(
+            self._stub().BulkCreateUsers(request, compression=grpc.Compression.Gzip)
+            for request in requests
+        ), return_exceptions=True)
+        users = []
+        errors = []
+        for response in responses:
+            if isinstance(response, grpc.RpcError):
+                errors.append(response)
+            elif isinstance(response, BaseException):
+                raise response
+            else:
+                users.extend(response.users)
+        logger.info(*header)
+        if errors:
+            for e in errors:
+                logger.error("Error: %s - %s", e.code(), e.details())
+            logger.warning("Partial failure: created %d of %d users (%d of %d chunks failed)",
+                           len(users), count, len(errors), len(requests))
+        else:
+            logger.info("Success! Created %d users", len(users))
+        if logger.isEnabledFor(logging.DEBUG):
+            for user in users:
+                logger.debug("  - %s: %s (%s)", user.id, user.username, user.email)
+        return users
+
+
+# Bulk-create fixture for run_all_tests, built once at import time. The second
+# test user rides along in the batch instead of paying for its own CreateUser
+# round-trip.
+_BULK_USER_REQUESTS = [
+    user_service_pb2.CreateUserRequest(
+        username="testuser2",
+        email="testuser2@example.com",
+        first_name="Test",
+        last_name="User2"
+    ),
+] + [
+    user_service_pb2.CreateUserRequest(
+        username=f"bulkuser{i}",
+        email=f"bulkuser{i}@example.com",
+        first_name="Bulk",
+        last_name=f"User{i}"
+    )
+    for i in range(1, 4)
+]
+
+
+async def run_all_tests():
     """Run tests for all UserService RPC methods"""
     print("=" * 60)
     print("UserService gRPC Client - Testing All Methods")
     print("=" * 60)
 
     client = UserServiceClient()
+    await client.connect()
 
     try:
         # Test 1: Create a single user
-        user1 = client.create_user(
+        user1 = await client.create_user(
             username="testuser1",
             email="testuser1@example.com",
             first_name="Test",
             last_name="User1"
         )
 
-        # Test 2: Create another user
-        user2 = client.create_user(
-            username="testuser2",
-            email="testuser2@example.com",
-            first_name="Test",
-            last_name="User2"
-        )
+        # Test 2: Bulk create users
+        await client.bulk_create_users_raw(_BULK_USER_REQUESTS)
 
-        # Test 3: Bulk create users
-        bulk_users = [
-            {
-                "username": "bulkuser1",
-                "email": "bulkuser1@example.com",
-                "first_name": "Bulk",
-                "last_name": "User1"
-            },
-            {
-                "username": "bulkuser2",
-                "email": "bulkuser2@example.com",
-                "first_name": "Bulk",
-                "last_name": "User2"
-            },
-            {
-                "username": "bulkuser3",
-                "email": "bulkuser3@example.com",
-                "first_name": "Bulk",
-                "last_name": "User3"
-            }
+        # Tests 3-6 are independent of each other: run them concurrently
+        tests = [
+            client.list_users(page=0, size=10),          # Test 3: List users
+            client.search_users(query="test", limit=5),  # Test 4: Search users
         ]
-        client.bulk_create_users(bulk_users)
-
-        # Test 4: List users
-        client.list_users(page=0, size=10)
-
-        # Test 5: Get specific user
         if user1:
-            client.get_user(user1.id)
-
-        # Test 6: Search users
-        client.search_users(query="test", limit=5)
-
-        # Test 7: Get user orders
-        if user1:
-            client.get_user_orders(user1.id)
+            tests += [
+                client.get_user(user1.id),         # Test 5: Get specific user
+                client.get_user_orders(user1.id),  # Test 6: Get user orders
+            ]
+        await asyncio.gather(*tests)
 
         print("\n" + "=" * 60)
         print("All tests completed!")
         print("=" * 60)
 
     finally:
-        client.close()
+        await client.close()
 
 
 if __name__ == "__main__":
-    run_all_tests()
+    # Show per-row details when run as a script; library callers pick their own level
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger.setLevel(logging.DEBUG)
+    asyncio.run(run_all_tests())
@@ -1,9 +1,12 @@
 #!/bin/bash
 
 # Generate Python gRPC code from proto file
+# With protobuf>=4.21 the generated message classes are backed by the native
+# upb runtime; --pyi_out adds type stubs for the otherwise dynamic classes.
 python3 -m grpc_tools.protoc \
   -I./proto \
   --python_out=. \
+  --pyi_out=. \
   --grpc_python_out=. \
   ./proto/user_service.proto
 
@@ -14,24 +14,33 @@ Usage:
 Requirements:
     - REST server running on localhost:8080
     - gRPC server running on localhost:9090
-    - Python packages: grpcio, requests
+    - Python packages: grpcio, requests, aiohttp, numpy, orjson (plus pyarrow for -o parquet)
 """
 
+import aiohttp
 import argparse
+import asyncio
 import grpc
-import json
-import random
+import itertools
+import numpy as np
+import orjson
+import os
 import requests
-import statistics
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, deque
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from yarl import URL
 import csv as csv_module
 from io import StringIO
 
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
 # Import gRPC generated code
 try:
     sys.path.append('../python-grpc-client')
@@ -43,15 +52,34 @@ except ImportError:
     sys.exit(1)
 
 
-@dataclass
-class RequestResult:
-    """Result of a single request"""
-    success: bool
-    response_time: float  # milliseconds
-    payload_size: int  # bytes
-    user_id: int
-    error_message: Optional[str] = None
-    error_type: Optional[str] = None
+class RequestResults:
+    """Results of every request in one run, stored as a struct of arrays
+
+    Request i is recorded at index i of each column, so workers write into
+    preallocated buffers instead of allocating one object per request.
+    """
+
+    def __init__(self, user_ids: List[int]):
+        n = len(user_ids)
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self.response_time_ns = np.zeros(n, dtype=np.int64)  # nanoseconds
+        self.payload_size = np.zeros(n, dtype=np.int64)  # bytes
+        self.success = np.zeros(n, dtype=bool)
+        self.error_type: List[Optional[str]] = [None] * n
+        self.error_message: List[Optional[str]] = [None] * n  # only filled in verbose mode
+
+    def __len__(self) -> int:
+        return len(self.success)
+
+    def record_success(self, i: int, response_time_ns: int, payload_size: int):
+        self.response_time_ns[i] = response_time_ns
+        self.payload_size[i] = payload_size
+        self.success[i] = True
+
+    def record_failure(self, i: int, response_time_ns: int, error_type: str, error_message: Optional[str]):
+        self.response_time_ns[i] = response_time_ns
+        self.error_type[i] = error_type
+        self.error_message[i] = error_message
 
 
 @dataclass
@@ -129,168 +157,376 @@ class PerformanceTester:
 
         return rest_ok, grpc_ok
 
-    def fetch_user_rest(self, user_id: int) -> RequestResult:
-        """Fetch a user via REST API"""
-        start_time = time.perf_counter()
+    def supports_grpc_stream(self) -> bool:
+        """Check whether the gRPC server implements the StreamGetUsers RPC"""
+        channel = grpc.insecure_channel(self.grpc_address)
         try:
-            response = requests.get(
-                f"{self.rest_base_url}/api/users/{user_id}",
-                timeout=30
-            )
-            end_time = time.perf_counter()
-            response_time = (end_time - start_time) * 1000  # Convert to ms
-
-            if response.status_code == 200:
-                payload_size = len(response.content)
-                return RequestResult(
-                    success=True,
-                    response_time=response_time,
-                    payload_size=payload_size,
-                    user_id=user_id
-                )
+            stub = user_service_pb2_grpc.UserServiceStub(channel)
+            for _ in stub.StreamGetUsers(iter([user_service_pb2.GetUserRequest(user_id=1)]), timeout=5):
+                pass
+            return True
+        except grpc.RpcError as e:
+            self.log(f"gRPC StreamGetUsers unavailable - {e.code().name}")
+            return False
+        finally:
+            channel.close()
+
+    async def fetch_user_rest(self, session: aiohttp.ClientSession, url: URL, results: RequestResults, i: int):
+        """Fetch a user via REST API and record the outcome at results[i]"""
+        start_time = time.perf_counter_ns()
+        try:
+            async with session.get(url) as response:
+                content = await response.read()
+            response_time_ns = time.perf_counter_ns() - start_time
+
+            if response.status == 200:
+                results.record_success(i, response_time_ns, len(content))
             else:
-                return RequestResult(
-                    success=False,
-                    response_time=response_time,
-                    payload_size=0,
-                    user_id=user_id,
-                    error_message=f"HTTP {response.status_code}",
-                    error_type=f"HTTP_{response.status_code}"
-                )
-        except requests.exceptions.Timeout:
-            end_time = time.perf_counter()
-            return RequestResult(
-                success=False,
-                response_time=(end_time - start_time) * 1000,
-                payload_size=0,
-                user_id=user_id,
-                error_message="Request timeout",
-                error_type="TIMEOUT"
-            )
+                results.record_failure(i, response_time_ns, f"HTTP_{response.status}",
+                                       f"HTTP {response.status}" if self.verbose else None)
+        except asyncio.TimeoutError:
+            results.record_failure(i, time.perf_counter_ns() - start_time, "TIMEOUT", "Request timeout")
         except Exception as e:
-            end_time = time.perf_counter()
-            return RequestResult(
-                success=False,
-                response_time=(end_time - start_time) * 1000,
-                payload_size=0,
-                user_id=user_id,
-                error_message=str(e),
-                error_type=type(e).__name__
-            )
+            results.record_failure(i, time.perf_counter_ns() - start_time, type(e).__name__,
+                                   str(e) if self.verbose else None)
 
-    def fetch_user_grpc(self, user_id: int, channel, stub) -> RequestResult:
-        """Fetch a user via gRPC API"""
-        start_time = time.perf_counter()
+    async def fetch_user_grpc(self, stub, request, results: RequestResults, i: int, payload_sizes: Dict[int, int]):
+        """Fetch a user via gRPC API using a prebuilt GetUserRequest and record the outcome at results[i]"""
+        start_time = time.perf_counter_ns()
         try:
-            request = user_service_pb2.GetUserRequest(user_id=user_id)
-            response = stub.GetUser(request, timeout=30)
-            end_time = time.perf_counter()
-            response_time = (end_time - start_time) * 1000  # Convert to ms
-
-            payload_size = response.ByteSize()
-            return RequestResult(
-                success=True,
-                response_time=response_time,
-                payload_size=payload_size,
-                user_id=user_id
-            )
+            response = await stub.GetUser(request, timeout=30)
+            response_time_ns = time.perf_counter_ns() - start_time
+            payload_size = payload_sizes.get(request.user_id)
+            if payload_size is None:
+                payload_size = payload_sizes[request.user_id] = response.ByteSize()
+            results.record_success(i, response_time_ns, payload_size)
         except grpc.RpcError as e:
-            end_time = time.perf_counter()
-            return RequestResult(
-                success=False,
-                response_time=(end_time - start_time) * 1000,
-                payload_size=0,
-                user_id=user_id,
-                error_message=e.details(),
-                error_type=e.code().name
-            )
+            results.record_failure(i, time.perf_counter_ns() - start_time, e.code().name,
+                                   e.details() if self.verbose else None)
         except Exception as e:
-            end_time = time.perf_counter()
-            return RequestResult(
-                success=False,
-                response_time=(end_time - start_time) * 1000,
-                payload_size=0,
-                user_id=user_id,
-                error_message=str(e),
-                error_type=type(e).__name__
-            )
-
-    def execute_rest_requests(self, user_ids: List[int], max_workers: int = 100) -> Tuple[List[RequestResult], float]:
-        """Execute parallel REST requests"""
+            results.record_failure(i, time.perf_counter_ns() - start_time, type(e).__name__,
+                                   str(e) if self.verbose else None)
+
+    async def _run_workers(self, label: str, user_ids: List[int], concurrency: int, fetch):
+        """Run fetch(i, user_id) for every request on `concurrency` worker coroutines"""
+        # A fixed set of workers pulls (index, user_id) pairs from one shared
+        # iterator, rather than creating a task per request and waiting on
+        # them with as_completed. Next() never awaits, so workers on the same
+        # loop cannot take the same item, and each worker's loop caps the
+        # number in flight without needing a semaphore.
+        jobs = enumerate(user_ids)
+        total = len(user_ids)
+        done = 0
+
+        async def worker():
+            nonlocal done
+            for i, user_id in jobs:
+                await fetch(i, user_id)
+                done += 1
+                if self.verbose and done % 100 == 0:
+                    self.log(f"{label}: {done}/{total} completed")
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+
+    def execute_rest_requests(self, user_ids: List[int], max_workers: int = 100,
+                              warmup: int = 100) -> Tuple[RequestResults, float]:
+        """Execute parallel REST requests, after `warmup` untimed ones"""
+        return asyncio.run(self._measure_rest_requests(user_ids, max_workers, warmup))
+
+    async def _measure_rest_requests(self, user_ids: List[int], concurrency: int, warmup: int,
+                                     warmed_up: Optional[Callable[[], Awaitable[None]]] = None
+                                     ) -> Tuple[RequestResults, float]:
+        """Run and time the REST requests on the current event loop"""
         self.log(f"Starting {len(user_ids)} parallel REST requests...")
-        start_time = time.perf_counter()
-        results = []
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(self.fetch_user_rest, uid) for uid in user_ids]
-            for i, future in enumerate(as_completed(futures), 1):
-                results.append(future.result())
-                if self.verbose and i % 100 == 0:
-                    self.log(f"REST: {i}/{len(user_ids)} completed")
-
-        end_time = time.perf_counter()
-        total_duration = end_time - start_time
+        results = RequestResults(user_ids)
+        total_duration = await self._run_rest_requests(user_ids, results, concurrency, warmup, warmed_up)
         self.log(f"REST requests completed in {total_duration:.2f}s")
         return results, total_duration
 
-    def execute_grpc_requests(self, user_ids: List[int], max_workers: int = 100) -> Tuple[List[RequestResult], float]:
-        """Execute parallel gRPC requests"""
-        self.log(f"Starting {len(user_ids)} parallel gRPC requests...")
-        start_time = time.perf_counter()
-        results = []
-
-        # Create channel and stub (reused across threads)
-        channel = grpc.insecure_channel(
-            self.grpc_address,
-            options=[
-                ('grpc.max_send_message_length', 50 * 1024 * 1024),
-                ('grpc.max_receive_message_length', 50 * 1024 * 1024),
-            ]
+    async def _run_rest_requests(self, user_ids: List[int], results: RequestResults, concurrency: int,
+                                 warmup: int, warmed_up: Optional[Callable[[], Awaitable[None]]] = None) -> float:
+        """Issue REST requests on one event loop, at most `concurrency` in flight; returns the timed duration
+
+        warmed_up, if given, is awaited between the warmup and the timed run.
+        """
+        # One shared keep-alive connection pool for every request, sized to the
+        # concurrency so no request waits for (or opens) an extra connection.
+        # The dummy cookie jar skips per-request cookie bookkeeping the
+        # benchmark never needs.
+        connector = aiohttp.TCPConnector(
+            limit=concurrency,
+            limit_per_host=concurrency,
+            ttl_dns_cache=300
         )
-        stub = user_service_pb2_grpc.UserServiceStub(channel)
+        timeout = aiohttp.ClientTimeout(total=30)
+
+        # Build each distinct URL once, outside the timed calls. Passing
+        # prebuilt, already-encoded yarl URLs also spares aiohttp from
+        # parsing and re-quoting the string on every request.
+        urls = {uid: URL(f"{self.rest_base_url}/api/users/{uid}", encoded=True) for uid in set(user_ids)}
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         cookie_jar=aiohttp.DummyCookieJar()) as session:
+            def fetcher(target: RequestResults):
+                async def fetch(i, user_id):
+                    await self.fetch_user_rest(session, urls[user_id], target, i)
+                return fetch
+
+            # Untimed burst first, so the timed run starts with the
+            # connection pool open and both sides' code paths hot
+            warmup_ids = self._warmup_ids(user_ids, warmup, concurrency)
+            if warmup_ids:
+                self.log(f"REST: warming up with {len(warmup_ids)} requests...")
+                await self._run_workers("REST warmup", warmup_ids, concurrency, fetcher(RequestResults(warmup_ids)))
+
+            if warmed_up is not None:
+                await warmed_up()
+            start_time = time.perf_counter()
+            await self._run_workers("REST", user_ids, concurrency, fetcher(results))
+            return time.perf_counter() - start_time
+
+    def execute_grpc_requests(self, user_ids: List[int], max_workers: int = 100, pool_size: int = 4,
+                              mode: str = "unary", warmup: int = 100) -> Tuple[RequestResults, float]:
+        """Execute parallel gRPC requests, as unary GetUser calls or over StreamGetUsers streams,
+        after `warmup` untimed ones"""
+        return asyncio.run(self._measure_grpc_requests(user_ids, max_workers, pool_size, mode, warmup))
+
+    async def _measure_grpc_requests(self, user_ids: List[int], concurrency: int, pool_size: int,
+                                     mode: str, warmup: int,
+                                     warmed_up: Optional[Callable[[], Awaitable[None]]] = None
+                                     ) -> Tuple[RequestResults, float]:
+        """Run and time the gRPC requests on the current event loop"""
+        self.log(f"Starting {len(user_ids)} parallel gRPC requests ({mode})...")
+        results = RequestResults(user_ids)
+        run = self._run_grpc_stream_requests if mode == "stream" else self._run_grpc_requests
+        total_duration = await run(user_ids, results, concurrency, pool_size, warmup, warmed_up)
+        self.log(f"gRPC requests completed in {total_duration:.2f}s")
+        return results, total_duration
 
-        def fetch_with_shared_channel(user_id):
-            return self.fetch_user_grpc(user_id, channel, stub)
+    def execute_parallel_requests(self, user_ids: List[int], max_workers: int = 100, pool_size: int = 4,
+                                  grpc_mode: str = "unary",
+                                  warmup: int = 100) -> Tuple[Tuple[RequestResults, float],
+                                                              Tuple[RequestResults, float]]:
+        """Execute the REST and gRPC requests at the same time, each with its own `max_workers` in flight"""
+        # Both runs share one event loop and hit the servers at the same
+        # moment, so neither protocol gets a warmer cache or a quieter
+        # machine than the other, and the total wall-clock time is halved.
+        # Each side waits at a two-party barrier after its warmup, so one
+        # protocol's warmup burst never lands in the other's timed window.
+        async def run_both():
+            both_warm = asyncio.Event()
+            pending = 2
+
+            async def warmed_up():
+                nonlocal pending
+                pending -= 1
+                if pending == 0:
+                    both_warm.set()
+                await both_warm.wait()
+
+            return await asyncio.gather(
+                self._measure_rest_requests(user_ids, max_workers, warmup, warmed_up),
+                self._measure_grpc_requests(user_ids, max_workers, pool_size, grpc_mode, warmup, warmed_up),
+            )
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(fetch_with_shared_channel, uid) for uid in user_ids]
-            for i, future in enumerate(as_completed(futures), 1):
-                results.append(future.result())
-                if self.verbose and i % 100 == 0:
-                    self.log(f"gRPC: {i}/{len(user_ids)} completed")
+        rest_run, grpc_run = asyncio.run(run_both())
+        return rest_run, grpc_run
+
+    def _open_grpc_channels(self, pool_size: int) -> List[grpc.aio.Channel]:
+        """Open a pool of grpc.aio channels, each on its own HTTP/2 connection"""
+        # A distinct channel_id plus a local subchannel pool stops gRPC from
+        # collapsing the channels onto one HTTP/2 connection, so load is not
+        # limited by a single connection's flow-control window.
+        return [
+            grpc.aio.insecure_channel(
+                self.grpc_address,
+                options=[
+                    ('grpc.max_send_message_length', 50 * 1024 * 1024),
+                    ('grpc.max_receive_message_length', 50 * 1024 * 1024),
+                    ('grpc.channel_id', i),
+                    ('grpc.use_local_subchannel_pool', 1),
+                ]
+            )
+            for i in range(pool_size)
+        ]
 
-        channel.close()
-        end_time = time.perf_counter()
-        total_duration = end_time - start_time
-        self.log(f"gRPC requests completed in {total_duration:.2f}s")
-        return results, total_duration
+    async def _wait_for_channels(self, channels: List[grpc.aio.Channel], timeout: float = 5):
+        """Wait until every pooled channel has finished connecting"""
+        try:
+            await asyncio.wait_for(asyncio.gather(*(channel.channel_ready() for channel in channels)), timeout)
+        except asyncio.TimeoutError:
+            self.log(f"gRPC: channels not ready after {timeout}s, continuing anyway")
+
+    @staticmethod
+    def _warmup_ids(user_ids: List[int], warmup: int, concurrency: int) -> List[int]:
+        """The IDs for the untimed warmup requests, cycling through user_ids
+
+        At least `concurrency` requests are sent (unless warmup is 0), so
+        every worker opens its connection before the clock starts.
+        """
+        if warmup <= 0 or not user_ids:
+            return []
+        return list(itertools.islice(itertools.cycle(user_ids), max(warmup, concurrency)))
+
+    async def _run_grpc_requests(self, user_ids: List[int], results: RequestResults, concurrency: int,
+                                 pool_size: int, warmup: int,
+                                 warmed_up: Optional[Callable[[], Awaitable[None]]] = None) -> float:
+        """Issue gRPC requests on one event loop, at most `concurrency` in flight; returns the timed duration"""
+        channels = self._open_grpc_channels(pool_size)
+        stubs = [user_service_pb2_grpc.UserServiceStub(channel) for channel in channels]
+        counter = itertools.count()
+
+        # Build each distinct request message once, outside the timed calls
+        requests_by_id = {uid: user_service_pb2.GetUserRequest(user_id=uid) for uid in set(user_ids)}
+        # GetUser returns the same message for the same id within a run, so
+        # ByteSize() only needs walking once per distinct id
+        payload_sizes: Dict[int, int] = {}
+
+        def fetcher(target: RequestResults):
+            async def fetch(i, user_id):
+                stub = stubs[next(counter) % pool_size]
+                await self.fetch_user_grpc(stub, requests_by_id[user_id], target, i, payload_sizes)
+            return fetch
+
+        try:
+            # Connect every channel and run an untimed burst first, so the
+            # timed run excludes HTTP/2 setup and cold code paths
+            await self._wait_for_channels(channels)
+            warmup_ids = self._warmup_ids(user_ids, warmup, concurrency)
+            if warmup_ids:
+                self.log(f"gRPC: warming up with {len(warmup_ids)} requests...")
+                await self._run_workers("gRPC warmup", warmup_ids, concurrency, fetcher(RequestResults(warmup_ids)))
+
+            if warmed_up is not None:
+                await warmed_up()
+            start_time = time.perf_counter()
+            await self._run_workers("gRPC", user_ids, concurrency, fetcher(results))
+            return time.perf_counter() - start_time
+        finally:
+            await asyncio.gather(*(channel.close() for channel in channels))
+
+    async def _run_grpc_stream_requests(self, user_ids: List[int], results: RequestResults, concurrency: int,
+                                        pool_size: int, warmup: int,
+                                        warmed_up: Optional[Callable[[], Awaitable[None]]] = None) -> float:
+        """Issue gRPC requests over StreamGetUsers streams, at most `concurrency` in flight overall;
+        returns the timed duration"""
+        # Up to two long-lived bidirectional streams per channel replace the
+        # N unary calls, so per-call stream setup is paid once per stream.
+        # Requests are dealt round-robin across the streams, and `concurrency`
+        # is split between them (the remainder going one each to the first
+        # streams), so the in-flight total matches the REST and unary runs.
+        channels = self._open_grpc_channels(pool_size)
+        stubs = [user_service_pb2_grpc.UserServiceStub(channel) for channel in channels]
+        stream_count = min(pool_size * 2, concurrency)
+        base_window, extra = divmod(concurrency, stream_count)
+        windows = [base_window + (s < extra) for s in range(stream_count)]
+
+        # Build each distinct request message once, outside the timed calls
+        requests_by_id = {uid: user_service_pb2.GetUserRequest(user_id=uid) for uid in set(user_ids)}
+        payload_sizes: Dict[int, int] = {}
+
+        async def run_stream(stub, window: int, ids: List[int], indices: List[int], target: RequestResults):
+            # The server answers in request order, so send timestamps queue up
+            # FIFO and the k-th response belongs to indices[k]
+            sent = deque()
+            slots = asyncio.Semaphore(window)
+            completed = 0
+            # The unary 30s deadline, stretched by 10ms per pipelined request
+            call = stub.StreamGetUsers(timeout=30 + len(indices) / 100)
+
+            async def send():
+                for i in indices:
+                    await slots.acquire()
+                    sent.append(time.perf_counter_ns())
+                    await call.write(requests_by_id[ids[i]])
+                await call.done_writing()
+
+            sender = asyncio.create_task(send())
+            try:
+                for i in indices:
+                    response = await call.read()
+                    if response is grpc.aio.EOF:
+                        raise RuntimeError("stream ended before all responses arrived")
+                    response_time_ns = time.perf_counter_ns() - sent.popleft()
+                    slots.release()
+                    if response.HasField("user"):
+                        payload_size = payload_sizes.get(ids[i])
+                        if payload_size is None:
+                            payload_size = payload_sizes[ids[i]] = response.ByteSize()
+                        target.record_success(i, response_time_ns, payload_size)
+                    else:
+                        # Same label as a unary miss: the server's GetUser
+                        # fails with a plain RuntimeException, i.e. UNKNOWN
+                        target.record_failure(i, response_time_ns, "UNKNOWN",
+                                              f"User not found: {ids[i]}" if self.verbose else None)
+                    completed += 1
+                await sender
+            except Exception as e:
+                sender.cancel()
+                call.cancel()
+                if isinstance(e, grpc.RpcError):
+                    error_type, error_message = e.code().name, e.details() if self.verbose else None
+                else:
+                    error_type, error_message = type(e).__name__, str(e) if self.verbose else None
+                # Everything not yet answered on this stream is lost with it
+                for i in indices[completed:]:
+                    target.record_failure(i, 0, error_type, error_message)
+
+        async def run_streams(ids: List[int], target: RequestResults):
+            count = min(stream_count, len(ids)) or 1
+            await asyncio.gather(*(
+                run_stream(stubs[s % pool_size], windows[s], ids, list(range(s, len(ids), count)), target)
+                for s in range(count)
+            ))
 
-    def calculate_metrics(self, results: List[RequestResult], protocol: str, duration: float) -> MetricResult:
+        try:
+            # Warm up over the same channels (and the same streaming code
+            # path) before the timed run
+            await self._wait_for_channels(channels)
+            warmup_ids = self._warmup_ids(user_ids, warmup, concurrency)
+            if warmup_ids:
+                self.log(f"gRPC: warming up with {len(warmup_ids)} requests...")
+                await run_streams(warmup_ids, RequestResults(warmup_ids))
+
+            if warmed_up is not None:
+                await warmed_up()
+            start_time = time.perf_counter()
+            await run_streams(user_ids, results)
+            return time.perf_counter() - start_time
+        finally:
+            await asyncio.gather(*(channel.close() for channel in channels))
+
+    def calculate_metrics(self, results: RequestResults, protocol: str, duration: float) -> MetricResult:
         """Calculate performance metrics from request results"""
         total_requests = len(results)
-        successful_results = [r for r in results if r.success]
-        failed_results = [r for r in results if not r.success]
+        success = results.success
 
-        successful_count = len(successful_results)
-        failed_count = len(failed_results)
+        successful_count = int(np.count_nonzero(success))
+        failed_count = total_requests - successful_count
         success_rate = (successful_count / total_requests * 100) if total_requests > 0 else 0
 
         # Calculate response time statistics (only for successful requests)
-        if successful_results:
-            response_times = [r.response_time for r in successful_results]
-            avg_response_time = statistics.mean(response_times)
-            min_response_time = min(response_times)
-            max_response_time = max(response_times)
-            median_response_time = statistics.median(response_times)
-            sorted_times = sorted(response_times)
-            p95_response_time = sorted_times[int(len(sorted_times) * 0.95)] if sorted_times else 0
-            p99_response_time = sorted_times[int(len(sorted_times) * 0.99)] if sorted_times else 0
-            stddev_response_time = statistics.stdev(response_times) if len(response_times) > 1 else 0
+        if successful_count:
+            # Timings are stored as integer ns; convert to ms once, here
+            response_times = results.response_time_ns[success] / 1e6
+            avg_response_time = float(response_times.mean())
+            min_response_time = float(response_times.min())
+            max_response_time = float(response_times.max())
+            # Linear interpolation between the closest ranks. np.quantile
+            # only partitions around the ranks it needs (introselect, O(N))
+            # rather than sorting; response_times is a scratch array, so let
+            # it partition in place instead of copying N values first. The
+            # order-independent stats around it are unaffected.
+            median_response_time, p95_response_time, p99_response_time = (
+                float(q) for q in np.quantile(response_times, [0.5, 0.95, 0.99], method="linear",
+                                              overwrite_input=True)
+            )
+            stddev_response_time = float(response_times.std(ddof=1)) if successful_count > 1 else 0
 
             # Payload statistics
-            payload_sizes = [r.payload_size for r in successful_results]
-            avg_payload_size = statistics.mean(payload_sizes)
-            total_bytes = sum(payload_sizes)
+            payload_sizes = results.payload_size[success]
+            avg_payload_size = float(payload_sizes.mean())
+            total_bytes = int(payload_sizes.sum())
 
             # Efficiency metrics
             throughput = successful_count / duration if duration > 0 else 0
@@ -302,11 +538,17 @@ class PerformanceTester:
             avg_payload_size = total_bytes = 0
             throughput = data_transfer_rate = network_efficiency = 0
 
-        # Categorize errors
-        errors = {}
-        for result in failed_results:
-            error_type = result.error_type or "UNKNOWN"
-            errors[error_type] = errors.get(error_type, 0) + 1
+        # Categorize errors in one pass over the failed slots
+        failed_types = itertools.compress(results.error_type, (~success).tolist())
+        errors = dict(Counter(error_type or "UNKNOWN" for error_type in failed_types))
+
+        # Messages are only captured in verbose mode; show one per error type
+        if self.verbose and errors:
+            samples = {}
+            for i in np.flatnonzero(~success):
+                samples.setdefault(results.error_type[i] or "UNKNOWN", results.error_message[i])
+            for error_type, message in sorted(samples.items()):
+                self.log(f"{protocol} {error_type} (e.g.): {message}")
 
         return MetricResult(
             protocol=protocol,
@@ -331,141 +573,156 @@ class PerformanceTester:
         )
 
 
-def format_console_output(rest_metrics: MetricResult, grpc_metrics: MetricResult, config: dict):
-    """Format results as console output"""
-    output = []
-    output.append("=" * 80)
-    output.append("PARALLEL PERFORMANCE TEST RESULTS")
-    output.append("=" * 80)
-    output.append("Test Configuration:")
-    output.append(f"  - Requests per Protocol: {config['requests']}")
-    output.append(f"  - User ID Range: {config['user_id_range']}")
-    output.append(f"  - REST Server: {config['rest_url']}")
-    output.append(f"  - gRPC Server: {config['grpc_url']}")
-    output.append(f"  - Test Time: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
-    output.append("")
-
-    # REST Results
-    output.append("=" * 80)
-    output.append("REST RESULTS")
-    output.append("=" * 80)
-    output.append(f"Success Rate:         {rest_metrics.success_rate:.1f}% ({rest_metrics.successful_requests}/{rest_metrics.total_requests} requests)")
-    output.append(f"Average Response:     {rest_metrics.avg_response_time:.2f} ms")
-    output.append(f"Median Response:      {rest_metrics.median_response_time:.2f} ms")
-    output.append(f"P95 Response:         {rest_metrics.p95_response_time:.2f} ms")
-    output.append(f"P99 Response:         {rest_metrics.p99_response_time:.2f} ms")
-    output.append(f"Min Response:         {rest_metrics.min_response_time:.2f} ms")
-    output.append(f"Max Response:         {rest_metrics.max_response_time:.2f} ms")
-    output.append(f"Std Deviation:        {rest_metrics.stddev_response_time:.2f} ms")
-    output.append("")
-    output.append(f"Avg Payload Size:     {rest_metrics.avg_payload_size:.0f} bytes")
-    output.append(f"Total Transferred:    {rest_metrics.total_bytes_transferred:,} bytes")
-    output.append(f"Throughput:           {rest_metrics.throughput:.1f} req/s")
-    output.append(f"Transfer Rate:        {rest_metrics.data_transfer_rate / 1024:.1f} KB/s")
-    output.append(f"Network Efficiency:   {rest_metrics.network_efficiency:.2f} bytes/ms")
-    output.append("")
-    if rest_metrics.errors:
-        output.append(f"Failed Requests:      {rest_metrics.failed_requests}")
-        output.append("Errors:")
-        for error_type, count in sorted(rest_metrics.errors.items()):
-            output.append(f"  - {error_type}: {count}")
-    output.append("")
-
-    # gRPC Results
-    output.append("=" * 80)
-    output.append("gRPC RESULTS")
-    output.append("=" * 80)
-    output.append(f"Success Rate:         {grpc_metrics.success_rate:.1f}% ({grpc_metrics.successful_requests}/{grpc_metrics.total_requests} requests)")
-    output.append(f"Average Response:     {grpc_metrics.avg_response_time:.2f} ms")
-    output.append(f"Median Response:      {grpc_metrics.median_response_time:.2f} ms")
-    output.append(f"P95 Response:         {grpc_metrics.p95_response_time:.2f} ms")
-    output.append(f"P99 Response:         {grpc_metrics.p99_response_time:.2f} ms")
-    output.append(f"Min Response:         {grpc_metrics.min_response_time:.2f} ms")
-    output.append(f"Max Response:         {grpc_metrics.max_response_time:.2f} ms")
-    output.append(f"Std Deviation:        {grpc_metrics.stddev_response_time:.2f} ms")
-    output.append("")
-    output.append(f"Avg Payload Size:     {grpc_metrics.avg_payload_size:.0f} bytes")
-    output.append(f"Total Transferred:    {grpc_metrics.total_bytes_transferred:,} bytes")
-    output.append(f"Throughput:           {grpc_metrics.throughput:.1f} req/s")
-    output.append(f"Transfer Rate:        {grpc_metrics.data_transfer_rate / 1024:.1f} KB/s")
-    output.append(f"Network Efficiency:   {grpc_metrics.network_efficiency:.2f} bytes/ms")
-    output.append("")
-    if grpc_metrics.errors:
-        output.append(f"Failed Requests:      {grpc_metrics.failed_requests}")
-        output.append("Errors:")
-        for error_type, count in sorted(grpc_metrics.errors.items()):
-            output.append(f"  - {error_type}: {count}")
-    output.append("")
-
-    # Comparison
-    output.append("=" * 80)
-    output.append("COMPARISON & ANALYSIS")
-    output.append("=" * 80)
-    output.append(f"{'Metric':<25} {'REST':<15} {'gRPC':<15} {'Winner':<10} {'Difference'}")
-    output.append("-" * 80)
-
-    def compare(metric_name, rest_val, grpc_val, unit, lower_is_better=True):
-        if rest_val == 0 and grpc_val == 0:
+_RULE = "=" * 80
+
+_CONFIG_TEMPLATE = """\
+{rule}
+PARALLEL PERFORMANCE TEST RESULTS
+{rule}
+Test Configuration:
+  - Requests per Protocol: {requests}
+  - User ID Range: {user_id_range}
+{seed_line}\
+  - REST Server: {rest_url}
+  - gRPC Server: {grpc_url}
+  - gRPC Mode: {grpc_mode}
+  - Protocol Runs: {protocol_runs}
+  - Test Time: {test_time} UTC
+"""
+
+_PROTOCOL_TEMPLATE = """\
+{rule}
+{title} RESULTS
+{rule}
+Success Rate:         {m.success_rate:.1f}% ({m.successful_requests}/{m.total_requests} requests)
+Average Response:     {m.avg_response_time:.2f} ms
+Median Response:      {m.median_response_time:.2f} ms
+P95 Response:         {m.p95_response_time:.2f} ms
+P99 Response:         {m.p99_response_time:.2f} ms
+Min Response:         {m.min_response_time:.2f} ms
+Max Response:         {m.max_response_time:.2f} ms
+Std Deviation:        {m.stddev_response_time:.2f} ms
+
+Avg Payload Size:     {m.avg_payload_size:.0f} bytes
+Total Transferred:    {m.total_bytes_transferred:,} bytes
+Throughput:           {m.throughput:.1f} req/s
+Transfer Rate:        {transfer_kb:.1f} KB/s
+Network Efficiency:   {m.network_efficiency:.2f} bytes/ms
+
+{errors}"""
+
+_COMPARISON_HEADER = f"""\
+{_RULE}
+COMPARISON & ANALYSIS
+{_RULE}
+{'Metric':<25} {'REST':<15} {'gRPC':<15} {'Winner':<10} {'Difference'}
+{"-" * 80}"""
+
+_NOTES = """\
+NOTES:
+  - Test conducted on localhost; production results may vary
+  - gRPC via Envoy proxy may add overhead in browser environments
+  - Consider testing under network latency for realistic comparison"""
+
+# (label, MetricResult field, unit, lower_is_better) for each comparison row
+_COMPARISON_ROWS = (
+    ("Avg Response Time", "avg_response_time", "ms", True),
+    ("Avg Payload Size", "avg_payload_size", "bytes", True),
+    ("Success Rate", "success_rate", "%", False),
+    ("Throughput", "throughput", "req/s", False),
+    ("Network Efficiency", "network_efficiency", "b/ms", False),
+)
+
+
+def _format_protocol_section(title: str, metrics: MetricResult) -> str:
+    """Render one protocol's results block"""
+    errors = ""
+    if metrics.errors:
+        errors = f"Failed Requests:      {metrics.failed_requests}\nErrors:\n" + "".join(
+            f"  - {error_type}: {count}\n" for error_type, count in sorted(metrics.errors.items())
+        )
+    return _PROTOCOL_TEMPLATE.format(rule=_RULE, title=title, m=metrics,
+                                     transfer_kb=metrics.data_transfer_rate / 1024, errors=errors)
+
+
+def _format_comparison_row(metric_name: str, rest_val: float, grpc_val: float, unit: str,
+                           lower_is_better: bool) -> str:
+    """Render one REST-vs-gRPC comparison row"""
+    if rest_val == 0 and grpc_val == 0:
+        winner = "TIE"
+        diff = "0%"
+    elif lower_is_better:
+        if rest_val < grpc_val:
+            winner = "REST"
+            diff_pct = ((grpc_val - rest_val) / grpc_val * 100) if grpc_val else 0
+            diff = f"+{diff_pct:.1f}% faster"
+        elif grpc_val < rest_val:
+            winner = "gRPC"
+            diff_pct = ((rest_val - grpc_val) / rest_val * 100) if rest_val else 0
+            diff = f"+{diff_pct:.1f}% faster"
+        else:
+            winner = "TIE"
+            diff = "0%"
+    else:  # higher is better
+        if rest_val > grpc_val:
+            winner = "REST"
+            diff_pct = ((rest_val - grpc_val) / grpc_val * 100) if grpc_val else 0
+            diff = f"+{diff_pct:.1f}% higher"
+        elif grpc_val > rest_val:
+            winner = "gRPC"
+            diff_pct = ((grpc_val - rest_val) / rest_val * 100) if rest_val else 0
+            diff = f"+{diff_pct:.1f}% higher"
+        else:
             winner = "TIE"
             diff = "0%"
-        elif lower_is_better:
-            if rest_val < grpc_val:
-                winner = "REST"
-                diff_pct = ((grpc_val - rest_val) / grpc_val * 100) if grpc_val else 0
-                diff = f"+{diff_pct:.1f}% faster"
-            elif grpc_val < rest_val:
-                winner = "gRPC"
-                diff_pct = ((rest_val - grpc_val) / rest_val * 100) if rest_val else 0
-                diff = f"+{diff_pct:.1f}% faster"
-            else:
-                winner = "TIE"
-                diff = "0%"
-        else:  # higher is better
-            if rest_val > grpc_val:
-                winner = "REST"
-                diff_pct = ((rest_val - grpc_val) / grpc_val * 100) if grpc_val else 0
-                diff = f"+{diff_pct:.1f}% higher"
-            elif grpc_val > rest_val:
-                winner = "gRPC"
-                diff_pct = ((grpc_val - rest_val) / rest_val * 100) if rest_val else 0
-                diff = f"+{diff_pct:.1f}% higher"
-            else:
-                winner = "TIE"
-                diff = "0%"
 
-        output.append(f"{metric_name:<25} {rest_val:.2f} {unit:<10} {grpc_val:.2f} {unit:<10} {winner:<10} {diff}")
+    return f"{metric_name:<25} {rest_val:.2f} {unit:<10} {grpc_val:.2f} {unit:<10} {winner:<10} {diff}"
 
-    compare("Avg Response Time", rest_metrics.avg_response_time, grpc_metrics.avg_response_time, "ms", lower_is_better=True)
-    compare("Avg Payload Size", rest_metrics.avg_payload_size, grpc_metrics.avg_payload_size, "bytes", lower_is_better=True)
-    compare("Success Rate", rest_metrics.success_rate, grpc_metrics.success_rate, "%", lower_is_better=False)
-    compare("Throughput", rest_metrics.throughput, grpc_metrics.throughput, "req/s", lower_is_better=False)
-    compare("Network Efficiency", rest_metrics.network_efficiency, grpc_metrics.network_efficiency, "b/ms", lower_is_better=False)
 
-    output.append("")
-    output.append("CONCLUSION:")
+def format_console_output(rest_metrics: MetricResult, grpc_metrics: MetricResult, config: dict):
+    """Format results as console output"""
+    header = _CONFIG_TEMPLATE.format(
+        **config,
+        rule=_RULE,
+        seed_line=f"  - Seed: {config['seed']}\n" if config["seed"] is not None else "",
+        protocol_runs="parallel" if config["parallel_protocols"] else "serial",
+        test_time=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+    )
+
+    comparison = "\n".join(
+        _format_comparison_row(label, getattr(rest_metrics, field), getattr(grpc_metrics, field), unit,
+                               lower_is_better)
+        for label, field, unit, lower_is_better in _COMPARISON_ROWS
+    )
 
     # Determine overall winner
     if rest_metrics.avg_response_time < grpc_metrics.avg_response_time:
         time_diff = ((grpc_metrics.avg_response_time - rest_metrics.avg_response_time) / grpc_metrics.avg_response_time * 100)
-        output.append(f"  - REST shows superior response time (+{time_diff:.1f}% faster)")
+        time_conclusion = f"  - REST shows superior response time (+{time_diff:.1f}% faster)"
     else:
         time_diff = ((rest_metrics.avg_response_time - grpc_metrics.avg_response_time) / rest_metrics.avg_response_time * 100)
-        output.append(f"  - gRPC shows superior response time (+{time_diff:.1f}% faster)")
+        time_conclusion = f"  - gRPC shows superior response time (+{time_diff:.1f}% faster)"
 
     if grpc_metrics.avg_payload_size < rest_metrics.avg_payload_size:
         size_diff = ((rest_metrics.avg_payload_size - grpc_metrics.avg_payload_size) / rest_metrics.avg_payload_size * 100)
-        output.append(f"  - gRPC has smaller payload size (-{size_diff:.1f}%)")
+        size_conclusion = f"  - gRPC has smaller payload size (-{size_diff:.1f}%)"
     else:
         size_diff = ((grpc_metrics.avg_payload_size - rest_metrics.avg_payload_size) / grpc_metrics.avg_payload_size * 100)
-        output.append(f"  - REST has smaller payload size (-{size_diff:.1f}%)")
-
-    output.append("")
-    output.append("NOTES:")
-    output.append("  - Test conducted on localhost; production results may vary")
-    output.append("  - gRPC via Envoy proxy may add overhead in browser environments")
-    output.append("  - Consider testing under network latency for realistic comparison")
-
-    return "\n".join(output)
+        size_conclusion = f"  - REST has smaller payload size (-{size_diff:.1f}%)"
+
+    return "\n".join((
+        header,
+        _format_protocol_section("REST", rest_metrics),
+        _format_protocol_section("gRPC", grpc_metrics),
+        _COMPARISON_HEADER,
+        comparison,
+        "",
+        "CONCLUSION:",
+        time_conclusion,
+        size_conclusion,
+        "",
+        _NOTES,
+    ))
 
 
 def format_json_output(rest_metrics: MetricResult, grpc_metrics: MetricResult, config: dict):
@@ -475,8 +732,11 @@ def format_json_output(rest_metrics: MetricResult, grpc_metrics: MetricResult, c
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "requests_per_protocol": config["requests"],
             "user_id_range": config["user_id_range"],
+            "seed": config["seed"],
             "rest_url": config["rest_url"],
-            "grpc_url": config["grpc_url"]
+            "grpc_url": config["grpc_url"],
+            "grpc_mode": config["grpc_mode"],
+            "parallel_protocols": config["parallel_protocols"]
         },
         "rest": asdict(rest_metrics),
         "grpc": asdict(grpc_metrics),
@@ -493,7 +753,7 @@ def format_json_output(rest_metrics: MetricResult, grpc_metrics: MetricResult, c
             }
         }
     }
-    return json.dumps(result, indent=2)
+    return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
 
 
 def format_csv_output(rest_metrics: MetricResult, grpc_metrics: MetricResult):
@@ -540,6 +800,73 @@ def format_csv_output(rest_metrics: MetricResult, grpc_metrics: MetricResult):
     return output.getvalue()
 
 
+def import_pyarrow():
+    """Import pyarrow and pyarrow.parquet, which are only needed for -o parquet"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        print("Error: -o parquet requires pyarrow (pip install pyarrow)", file=sys.stderr)
+        sys.exit(1)
+    return pyarrow, pyarrow.parquet
+
+
+def write_parquet_output(rest_results: RequestResults, grpc_results: RequestResults, rest_metrics: MetricResult,
+                         grpc_metrics: MetricResult, config: dict, path: str):
+    """Write every individual request, for both protocols, as one zstd-compressed Parquet table"""
+    pa, pq = import_pyarrow()
+
+    # Columns come straight from the result arrays, so no per-request Python
+    # objects are built; the run configuration and aggregated metrics ride
+    # along as file metadata
+    def columns(protocol: str, results: RequestResults) -> Dict[str, pa.Array]:
+        return {
+            "protocol": pa.array([protocol] * len(results), pa.string()).dictionary_encode(),
+            "user_id": pa.array(results.user_ids),
+            "response_time_ms": pa.array(results.response_time_ns / 1e6),
+            "payload_size": pa.array(results.payload_size),
+            "success": pa.array(results.success),
+            "error_type": pa.array(results.error_type, pa.string()),
+        }
+
+    table = pa.concat_tables([
+        pa.table(columns("REST", rest_results)),
+        pa.table(columns("gRPC", grpc_results)),
+    ])
+    table = table.replace_schema_metadata({
+        "test_metadata": orjson.dumps(config),
+        "rest_metrics": orjson.dumps(asdict(rest_metrics)),
+        "grpc_metrics": orjson.dumps(asdict(grpc_metrics)),
+    })
+    pq.write_table(table, path, compression="zstd")
+
+
+def raise_open_file_limit(target: int = 65535) -> Optional[int]:
+    """Raise the soft RLIMIT_NOFILE towards `target` (capped at the hard limit); returns the new soft limit"""
+    # Every in-flight REST request holds a socket, so the common 1024 default
+    # would start failing with EMFILE long before the server saturates
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = target if hard == resource.RLIM_INFINITY else min(target, hard)
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+            soft = wanted
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+def parse_cpu_list(spec: str) -> set:
+    """Parse a CPU list such as '0-3' or '0,2,4-5' into a set of CPU ids"""
+    cpus = set()
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Parallel Performance Testing: REST vs gRPC",
@@ -565,11 +892,56 @@ Examples:
         default="1-10000",
         help="Range of user IDs to randomly select from (format: min-max)"
     )
+    parser.add_argument(
+        "--unique-ids",
+        action="store_true",
+        help="Sample user IDs without replacement (requires --requests <= size of --user-id-range)"
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=100,
+        help="Maximum requests in flight per protocol (default: 100)"
+    )
+    parser.add_argument(
+        "--cpu-affinity",
+        type=str,
+        help="Pin the test process to these CPUs, e.g. '0-3' or '0,2' (Linux only)"
+    )
+    parser.add_argument(
+        "--grpc-mode",
+        choices=["unary", "stream"],
+        default="unary",
+        help="Issue gRPC requests as unary GetUser calls or over StreamGetUsers streams (default: unary)"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=100,
+        help="Untimed requests per protocol before measuring, raised to at least --concurrency so the "
+             "whole connection pool is open; 0 to disable (default: 100)"
+    )
+    parser.add_argument(
+        "--parallel-protocols",
+        action="store_true",
+        help="Run the REST and gRPC requests at the same time instead of one after the other"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for user ID generation, for reproducible runs (default: random)"
+    )
     parser.add_argument(
         "-o", "--output",
-        choices=["console", "json", "csv"],
+        choices=["console", "json", "csv", "parquet"],
         default="console",
-        help="Output format (default: console)"
+        help="Output format (default: console); parquet writes every request to --parquet-file"
+    )
+    parser.add_argument(
+        "--parquet-file",
+        type=str,
+        default="results.parquet",
+        help="Destination for -o parquet (default: results.parquet)"
     )
     parser.add_argument(
         "--rest-url",
@@ -600,9 +972,39 @@ Examples:
         print("Error: Invalid user-id-range format. Use 'min-max' (e.g., '1-10000')", file=sys.stderr)
         sys.exit(1)
 
+    if args.concurrency < 1:
+        print("Error: --concurrency must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    if args.warmup < 0:
+        print("Error: --warmup cannot be negative", file=sys.stderr)
+        sys.exit(1)
+
+    if args.output == "parquet":
+        # Fail before the run rather than after it
+        import_pyarrow()
+
+    if args.cpu_affinity:
+        # Keeping the event loop on a fixed set of cores avoids migrations
+        # that show up as P99 jitter
+        if not hasattr(os, "sched_setaffinity"):
+            print("Error: --cpu-affinity is only supported on Linux", file=sys.stderr)
+            sys.exit(1)
+        try:
+            os.sched_setaffinity(0, parse_cpu_list(args.cpu_affinity))
+        except (ValueError, OSError) as e:
+            print(f"Error: Invalid --cpu-affinity '{args.cpu_affinity}': {e}", file=sys.stderr)
+            sys.exit(1)
+
     # Initialize tester
     tester = PerformanceTester(args.rest_url, args.grpc_url, args.verbose)
 
+    open_files = raise_open_file_limit()
+    if open_files is not None:
+        tester.log(f"Open file limit: {open_files}")
+        if open_files < args.concurrency + 64:
+            print(f"Warning: open file limit {open_files} may be too low for --concurrency {args.concurrency}",
+                  file=sys.stderr)
+
     # Test connectivity
     rest_ok, grpc_ok = tester.test_connectivity()
     if not rest_ok or not grpc_ok:
@@ -614,14 +1016,33 @@ Examples:
         print("\nPlease ensure both servers are running before running the test.", file=sys.stderr)
         sys.exit(1)
 
-    # Generate random user IDs
-    user_ids = [random.randint(min_id, max_id) for _ in range(args.requests)]
+    grpc_mode = args.grpc_mode
+    if grpc_mode == "stream" and not tester.supports_grpc_stream():
+        print("Warning: gRPC server does not implement StreamGetUsers; falling back to unary calls",
+              file=sys.stderr)
+        grpc_mode = "unary"
+
+    # Generate random user IDs in one vectorised call; the same --seed gives
+    # the same ID sequence, so runs can be compared like for like
+    rng = np.random.default_rng(args.seed)
+    if args.unique_ids:
+        if args.requests > max_id - min_id + 1:
+            print("Error: --unique-ids needs --requests <= the number of IDs in --user-id-range", file=sys.stderr)
+            sys.exit(1)
+        user_ids = (rng.choice(max_id - min_id + 1, size=args.requests, replace=False) + min_id).tolist()
+    else:
+        user_ids = rng.integers(min_id, max_id + 1, size=args.requests).tolist()
 
     # Execute tests
     tester.log(f"Starting parallel performance test with {args.requests} requests...")
 
-    rest_results, rest_duration = tester.execute_rest_requests(user_ids)
-    grpc_results, grpc_duration = tester.execute_grpc_requests(user_ids)
+    if args.parallel_protocols:
+        (rest_results, rest_duration), (grpc_results, grpc_duration) = tester.execute_parallel_requests(
+            user_ids, args.concurrency, grpc_mode=grpc_mode, warmup=args.warmup)
+    else:
+        rest_results, rest_duration = tester.execute_rest_requests(user_ids, args.concurrency, warmup=args.warmup)
+        grpc_results, grpc_duration = tester.execute_grpc_requests(user_ids, args.concurrency, mode=grpc_mode,
+                                                                   warmup=args.warmup)
 
     # Calculate metrics
     rest_metrics = tester.calculate_metrics(rest_results, "REST", rest_duration)
@@ -631,8 +1052,11 @@ Examples:
     config = {
         "requests": args.requests,
         "user_id_range": args.user_id_range,
+        "seed": args.seed,
         "rest_url": args.rest_url,
-        "grpc_url": args.grpc_url
+        "grpc_url": args.grpc_url,
+        "grpc_mode": grpc_mode,
+        "parallel_protocols": args.parallel_protocols
     }
 
     # Format and display output
@@ -642,6 +1066,11 @@ Examples:
         print(format_json_output(rest_metrics, grpc_metrics, config))
     elif args.output == "csv":
         print(format_csv_output(rest_metrics, grpc_metrics))
+    elif args.output == "parquet":
+        write_parquet_output(rest_results, grpc_results, rest_metrics, grpc_metrics, config, args.parquet_file)
+        # The file holds the raw rows; still show the summary, on stderr
+        print(format_console_output(rest_metrics, grpc_metrics, config), file=sys.stderr)
+        print(f"\nWrote {len(rest_results) + len(grpc_results)} request rows to {args.parquet_file}", file=sys.stderr)
 
 
 if __name__ == "__main__":